@@ -31,11 +31,13 @@ LAMBDA_WEIGHTS = {
     "lambda1": 0.10,  # Unigram weight
 }
 
-# Output files
+# Output files (bigram/trigram are line-delimited JSON: these contexts
+# number in the hundreds of thousands on the full dataset, and JSONL lets
+# both export and frontend load stream line by line)
 OUTPUT_FILES = {
     "unigram": EXPORTS_DIR / "unigram.json",
-    "bigram": EXPORTS_DIR / "bigram.json",
-    "trigram": EXPORTS_DIR / "trigram.json",
+    "bigram": EXPORTS_DIR / "bigram.jsonl",
+    "trigram": EXPORTS_DIR / "trigram.jsonl",
 }
 
 # Ensure exports directory exists
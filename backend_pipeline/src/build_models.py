@@ -1,9 +1,12 @@
 """Main pipeline script to build chord probability models from CSV data."""
 
-import json
+import multiprocessing
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, wait
 from pathlib import Path
 from typing import Optional
+import orjson
 import polars as pl
 
 # Add parent directory to path for imports
@@ -16,11 +19,61 @@ from backend_pipeline.config import (
     CHUNK_SIZE,
     BACKOFF_THRESHOLD,
 )
-from backend_pipeline.src.chord_parser import parse_chords
+from backend_pipeline.src.chord_parser import parse_chords_df
 from backend_pipeline.src.data_loader import load_data, get_chord_column_name
 from backend_pipeline.src.ngram_builder import NGramBuilder
 
 
+def _count_chunk(ngram_builder: NGramBuilder, chunk_df: pl.DataFrame, chord_column: str):
+    """Parse one chunk columnarly and update the builder's counts.
+
+    Args:
+        ngram_builder: Builder receiving the counts
+        chunk_df: Chunk of raw rows
+        chord_column: Name of the chord column
+
+    Returns:
+        Tuple of (processed, skipped) song counts for this chunk
+    """
+    parsed = parse_chords_df(chunk_df, chord_column)
+
+    # Stay columnar: intern this chunk's distinct chords once, map the
+    # whole chord column to int ids, and derive per-song lengths from
+    # the run-length encoding of song_id - no per-song Python lists
+    chord_col = parsed.get_column("chord")
+    ngram_builder.intern_chords(chord_col.unique().to_list())
+    chord_ids = chord_col.replace_strict(
+        ngram_builder.vocab, return_dtype=pl.Int64
+    ).to_numpy()
+    song_lengths = (
+        parsed.get_column("song_id").rle().struct.field("len").to_numpy()
+    )
+
+    # Songs that produced no valid chords at all
+    skipped = chunk_df.height - len(song_lengths)
+
+    # Need at least 2 chords for unigram
+    long_enough = song_lengths >= 2
+    skipped += int((~long_enough).sum())
+    chord_ids = chord_ids[long_enough.repeat(song_lengths)]
+    song_lengths = song_lengths[long_enough]
+
+    # Update n-gram counts for the whole chunk
+    ngram_builder.update_counts_batch(chord_ids, song_lengths)
+    return len(song_lengths), skipped
+
+
+def _process_slice(chunk_df: pl.DataFrame, chord_column: str):
+    """Worker entry point: count one slice of a chunk in its own process.
+
+    Builds a process-local NGramBuilder and returns its raw counters for
+    merging in the parent. Must stay a top-level function so it pickles.
+    """
+    local_builder = NGramBuilder()
+    processed, skipped = _count_chunk(local_builder, chunk_df, chord_column)
+    return local_builder.get_raw_counts(), processed, skipped
+
+
 def process_dataset(
     dataset_path: Path,
     chunk_size: int = CHUNK_SIZE,
@@ -48,48 +101,70 @@ def process_dataset(
     processed_songs = 0
     skipped_songs = 0
     
+    # Counting is embarrassingly parallel per song: shard each chunk across
+    # worker processes and merge their local counters back into the builder
+    max_workers = os.cpu_count() or 1
+
+    # Detect the chord column once from the header; every chunk comes from the
+    # same file, so there is no need to re-detect it per chunk
+    try:
+        chord_column = get_chord_column_name(pl.read_csv(str(dataset_path), n_rows=0))
+    except ValueError as e:
+        print(f"Error: {e}")
+        raise
+
     # Load and process data
     try:
-        for chunk_df in load_data(dataset_path, chunk_size=chunk_size):
-            # Get chord column name
-            try:
-                chord_column = get_chord_column_name(chunk_df)
-            except ValueError as e:
-                print(f"Error: {e}")
-                continue
-            
-            # Process each row (song) in chunk
-            for row in chunk_df.iter_rows(named=True):
-                total_songs += 1
-                chord_string = row.get(chord_column, "")
-                
-                if not chord_string or not isinstance(chord_string, str):
-                    skipped_songs += 1
-                    continue
-                
-                # Parse chords
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            for chunk_df in load_data(dataset_path, chunk_size=chunk_size):
+                total_songs += chunk_df.height
+                before = processed_songs
+
+                # Accumulate this chunk's contributions locally so a failure
+                # partway through can't double-count songs already tallied
+                chunk_processed = 0
+                chunk_skipped = 0
                 try:
-                    chord_sequence = parse_chords(chord_string)
-                    
-                    if len(chord_sequence) < 2:
-                        # Need at least 2 chords for unigram
-                        skipped_songs += 1
-                        continue
-                    
-                    # Update n-gram counts
-                    ngram_builder.update_counts(chord_sequence)
-                    processed_songs += 1
-                    
-                    # Progress logging
-                    if processed_songs % progress_interval == 0:
-                        print(f"  Processed {processed_songs} songs...")
-                        
+                    # Slices below ~2k rows aren't worth the round-trip
+                    n_slices = min(max_workers, max(1, chunk_df.height // 2000))
+
+                    if n_slices == 1:
+                        chunk_processed, chunk_skipped = _count_chunk(ngram_builder, chunk_df, chord_column)
+                    else:
+                        slice_size = -(-chunk_df.height // n_slices)  # ceil division
+                        futures = [
+                            pool.submit(_process_slice, chunk_df.slice(i * slice_size, slice_size), chord_column)
+                            for i in range(n_slices)
+                        ]
+                        try:
+                            for future in futures:
+                                counts, processed, skipped = future.result()
+                                ngram_builder.merge_raw_counts(counts)
+                                chunk_processed += processed
+                                chunk_skipped += skipped
+                        except Exception:
+                            # Don't leave slices running unawaited: drop what
+                            # hasn't started and wait out the rest
+                            for future in futures:
+                                future.cancel()
+                            wait(futures)
+                            raise
                 except Exception as e:
-                    skipped_songs += 1
-                    if processed_songs < 10:  # Only log first few errors
-                        print(f"  Warning: Skipped song due to error: {e}")
-                    continue
-    
+                    # Slices that completed already counted their songs; only
+                    # the unaccounted remainder of the chunk is skipped
+                    chunk_skipped = chunk_df.height - chunk_processed
+                    print(f"  Warning: Skipped rest of chunk due to error: {e}")
+
+                processed_songs += chunk_processed
+                skipped_songs += chunk_skipped
+
+                # Progress logging
+                if processed_songs // progress_interval > before // progress_interval:
+                    print(f"  Processed {processed_songs} songs...")
+
     except Exception as e:
         print(f"\nError processing dataset: {e}")
         raise
@@ -105,57 +180,77 @@ def process_dataset(
     return ngram_builder
 
 
+def _write_model_jsonl(model: dict, path: Path):
+    """Write a sparse model as line-delimited JSON.
+
+    First line carries the smoothing header {"alpha", "vocab_size"}; every
+    following line is one context: {"c": context, "t": total, "o": obs}.
+    Serializing one small object per line keeps the write append-only and
+    memory-bounded - no giant nested dict is ever encoded in one piece.
+    """
+    with open(path, "wb") as f:
+        f.write(orjson.dumps({"alpha": model["alpha"], "vocab_size": model["vocab_size"]}))
+        f.write(b"\n")
+        for context, entry in model["contexts"].items():
+            f.write(orjson.dumps({"c": context, "t": entry["total"], "o": entry["obs"]}))
+            f.write(b"\n")
+
+
 def export_models(ngram_builder: NGramBuilder, output_dir: Path):
     """Export models to JSON files.
-    
+
     Args:
         ngram_builder: NGramBuilder instance with built models
         output_dir: Directory to save JSON files
     """
-    print("Normalizing probabilities and applying smoothing...")
-    
-    # Normalize and apply smoothing
-    ngram_builder.normalize()
-    ngram_builder.apply_smoothing(alpha=1.0)
-    
-    # Get models with count metadata for backoff threshold checking
-    models = ngram_builder.get_models(include_counts=True)
-    
-    # Convert models to JSON-serializable format
-    # Unigram: models["unigram"] is already a dict of {context: {next_chord: prob}}
+    print("Finalizing counts and smoothing parameters...")
+
+    # Materialize counts and fix smoothing parameters in one pass
+    ngram_builder.finalize(alpha=1.0)
+
+    # Get models with count metadata for backoff threshold checking. Weak
+    # bigram/trigram contexts are omitted entirely: the frontend backs off
+    # when the context total in metadata.json is below BACKOFF_THRESHOLD, so
+    # their distributions would be shipped but never queried
+    models = ngram_builder.get_models(
+        include_counts=True, min_context_total=BACKOFF_THRESHOLD
+    )
+
+    # Each model is already in sparse export form:
+    # {"alpha", "vocab_size", "contexts": {ctx: {"total": T, "obs": {...}}}}
     unigram_export = models["unigram"]
-    
-    # Export each model
+
+    # Export each model; bigram/trigram go out as JSONL since their context
+    # counts scale with |V|^2 and |V|^3 and a single JSON object would have
+    # to be built and parsed whole
     output_files = {
         "unigram": output_dir / "unigram.json",
-        "bigram": output_dir / "bigram.json",
-        "trigram": output_dir / "trigram.json",
+        "bigram": output_dir / "bigram.jsonl",
+        "trigram": output_dir / "trigram.jsonl",
     }
-    
+
     print("\nExporting models to JSON...")
-    
+
     # Export unigram
-    with open(output_files["unigram"], "w") as f:
-        json.dump(unigram_export, f, indent=2)
+    with open(output_files["unigram"], "wb") as f:
+        f.write(orjson.dumps(unigram_export, option=orjson.OPT_INDENT_2))
     print(f"  ✓ Exported unigram model: {output_files['unigram']}")
-    print(f"    Contexts: {len(unigram_export)}")
-    
+    print(f"    Contexts: {len(unigram_export['contexts'])}")
+
     # Export bigram
-    with open(output_files["bigram"], "w") as f:
-        json.dump(models["bigram"], f, indent=2)
+    _write_model_jsonl(models["bigram"], output_files["bigram"])
     print(f"  ✓ Exported bigram model: {output_files['bigram']}")
-    print(f"    Contexts: {len(models['bigram'])}")
-    
+    print(f"    Contexts: {len(models['bigram']['contexts'])}")
+
     # Export trigram
-    with open(output_files["trigram"], "w") as f:
-        json.dump(models["trigram"], f, indent=2)
+    _write_model_jsonl(models["trigram"], output_files["trigram"])
     print(f"  ✓ Exported trigram model: {output_files['trigram']}")
-    print(f"    Contexts: {len(models['trigram'])}")
+    print(f"    Contexts: {len(models['trigram']['contexts'])}")
     
     # Export metadata (counts) for backoff threshold checking
     metadata_file = output_dir / "metadata.json"
-    with open(metadata_file, "w") as f:
-        json.dump(models["metadata"], f, indent=2)
+    with open(metadata_file, "wb") as f:
+        f.write(orjson.dumps(models["metadata"], option=orjson.OPT_INDENT_2))
     print(f"  ✓ Exported metadata: {metadata_file}")
     
     print("\n✓ All models exported successfully!\n")
@@ -3,6 +3,20 @@
 import re
 from typing import List
 
+import polars as pl
+
+# Compiled once at import: these run millions of times on large datasets
+_SECTION_RE = re.compile(r'<[^>]+>')
+_NO3D_RE = re.compile(r'no3d', re.IGNORECASE)
+
+_FLAT_TO_SHARP = {
+    "Db": "C#",
+    "Eb": "D#",
+    "Gb": "F#",
+    "Ab": "G#",
+    "Bb": "A#",
+}
+
 
 def normalize_root(note: str) -> str:
     """Convert flats to sharps for consistent root note representation.
@@ -13,56 +27,15 @@ def normalize_root(note: str) -> str:
     Returns:
         Normalized root note using sharps (e.g., "C#", "D#", "C#")
     """
-    flat_to_sharp = {
-        "Db": "C#",
-        "Eb": "D#",
-        "Gb": "F#",
-        "Ab": "G#",
-        "Bb": "A#",
-    }
-    return flat_to_sharp.get(note, note)
+    return _FLAT_TO_SHARP.get(note, note)
 
 
-def parse_chord(chord_str: str) -> str:
-    """Parse and normalize a single chord string.
-    
-    Handles:
-    - Root note normalization (flats → sharps)
-    - Quality extraction (maj, min, 7, maj7, min7, dim, aug, sus, add, etc.)
-    - Slash chord simplification (C/E → C, ignore bass for now)
-    - Inversion removal
-    
-    Args:
-        chord_str: Raw chord string (e.g., "C", "Amin", "Fmaj7", "C/E", "no3d")
-        
-    Returns:
-        Normalized chord string (e.g., "C", "Amin", "Fmaj7")
+def _classify_quality_slow(quality_part: str) -> str:
+    """Classify a chord quality suffix via substring checks.
+
+    Slow path for suffixes not covered by _QUALITY_LUT; same precedence as the
+    vectorized dispatch in parse_chords_df.
     """
-    if not chord_str or chord_str.strip() == "":
-        return None
-    
-    chord_str = chord_str.strip()
-    
-    # Handle special cases
-    if "no3d" in chord_str.lower():
-        # Remove no3d notation, keep the root
-        chord_str = re.sub(r'no3d', '', chord_str, flags=re.IGNORECASE)
-    
-    # Handle slash chords (C/E → C, ignore bass)
-    if "/" in chord_str:
-        chord_str = chord_str.split("/")[0]
-    
-    # Extract root note (first 1-2 characters, handling sharps/flats)
-    root_match = re.match(r'^([A-G][#b]?)', chord_str)
-    if not root_match:
-        return None
-    
-    root = root_match.group(1)
-    root = normalize_root(root)
-    
-    # Extract quality (everything after root)
-    quality_part = chord_str[len(root_match.group(0)):].strip()
-    
     # Normalize common quality patterns
     quality_map = {
         "": "maj",  # Default to major if no quality specified
@@ -119,6 +92,69 @@ def parse_chord(chord_str: str) -> str:
         # Default: try to map or use as-is
         quality = quality_map.get(quality_part.lower(), quality_part.lower() if quality_part else "maj")
     
+    return quality
+
+
+# Precomputed suffix -> canonical quality table; derived from the slow path so
+# the two can never disagree. Covers the overwhelming majority of real tokens,
+# turning the branchy substring scan into a single dict lookup.
+_QUALITY_LUT = {
+    suffix: _classify_quality_slow(suffix)
+    for suffix in (
+        "", "m", "min", "minor", "maj", "major", "M",
+        "7", "maj7", "M7", "m7", "min7", "9", "11", "13",
+        "dim", "dim7", "diminished", "aug", "augmented",
+        "sus", "sus4", "sus2", "add", "add9", "add11", "add13",
+        "6", "m6", "69", "5",
+    )
+}
+
+
+def _parse_chord_impl(chord_str: str) -> str:
+    """Parse and normalize a single chord string.
+    
+    Handles:
+    - Root note normalization (flats → sharps)
+    - Quality extraction (maj, min, 7, maj7, min7, dim, aug, sus, add, etc.)
+    - Slash chord simplification (C/E → C, ignore bass for now)
+    - Inversion removal
+    
+    Args:
+        chord_str: Raw chord string (e.g., "C", "Amin", "Fmaj7", "C/E", "no3d")
+        
+    Returns:
+        Normalized chord string (e.g., "C", "Amin", "Fmaj7")
+    """
+    if not chord_str or chord_str.strip() == "":
+        return None
+    
+    chord_str = chord_str.strip()
+    
+    # Handle special cases
+    if "no3d" in chord_str.lower():
+        # Remove no3d notation, keep the root
+        chord_str = _NO3D_RE.sub('', chord_str)
+    
+    # Handle slash chords (C/E → C, ignore bass)
+    if "/" in chord_str:
+        chord_str = chord_str.split("/")[0]
+    
+    # Extract root note (first 1-2 characters, handling sharps/flats)
+    # Direct index checks instead of a regex: this is the hottest branch
+    if not chord_str or chord_str[0] not in "ABCDEFG":
+        return None
+    
+    root_len = 2 if len(chord_str) > 1 and chord_str[1] in "#b" else 1
+    root = normalize_root(chord_str[:root_len])
+    
+    # Extract quality (everything after root)
+    quality_part = chord_str[root_len:].strip()
+    
+    # Fast path: almost every real-world suffix is already in the lookup table
+    quality = _QUALITY_LUT.get(quality_part)
+    if quality is None:
+        quality = _classify_quality_slow(quality_part)
+    
     # Construct normalized chord
     if quality == "maj":
         return root  # Omit "maj" for major chords (C instead of Cmaj)
@@ -126,6 +162,128 @@ def parse_chord(chord_str: str) -> str:
         return f"{root}{quality}"
 
 
+# Raw token -> parsed result memo. Chord vocabularies are tiny relative to
+# token counts, so after a short warmup nearly every call is a dict hit.
+# A sentinel distinguishes "never seen" from tokens that legitimately parse
+# to None, so invalid tokens are cached too.
+_PARSE_CACHE = {}
+_MISS = object()
+
+
+def parse_chord(chord_str: str) -> str:
+    """Memoized front-end for _parse_chord_impl; see its docstring."""
+    result = _PARSE_CACHE.get(chord_str, _MISS)
+    if result is _MISS:
+        result = _parse_chord_impl(chord_str)
+        _PARSE_CACHE[chord_str] = result
+    return result
+
+
+def parse_chords_df(df: pl.DataFrame, col: str) -> pl.DataFrame:
+    """Parse and normalize a whole chord column with vectorized Polars expressions.
+
+    Columnar equivalent of calling parse_chords() on every row: strips section
+    tags, splits on whitespace, normalizes roots (flats → sharps) and qualities,
+    and drops invalid tokens. All string work runs as Polars expressions
+    (Rust-side, multi-threaded) instead of per-row Python calls.
+
+    Args:
+        df: DataFrame containing the chord column
+        col: Name of the column with raw chord sequence strings
+
+    Returns:
+        Flat DataFrame with columns (song_id, chord) where song_id is the row
+        index within df and chords appear in sequence order
+    """
+    # Strip section tags, collapse whitespace, split into one row per token
+    tokens = (
+        df.lazy()
+        .with_row_index("song_id")
+        .select(
+            pl.col("song_id"),
+            pl.col(col)
+            .str.replace_all(r"<[^>]+>", "")
+            .str.replace_all(r"\s+", " ")
+            .str.strip_chars()
+            .str.split(" ")
+            .alias("chord"),
+        )
+        .explode("chord")
+        .filter(pl.col("chord").str.len_chars() > 0)
+    )
+
+    # Drop no3d notation and slash-chord bass notes (C/E → C)
+    token = (
+        pl.col("chord")
+        .str.replace_all(r"(?i)no3d", "")
+        .str.split("/")
+        .list.first()
+    )
+
+    # Root note with flat → sharp normalization (mirrors normalize_root)
+    root = (
+        token.str.extract(r"^([A-G][#b]?)", 1)
+        .str.replace_many(["Db", "Eb", "Gb", "Ab", "Bb"], ["C#", "D#", "F#", "G#", "A#"])
+    )
+
+    # Quality part (everything after the root)
+    qp = token.str.replace(r"^[A-G][#b]?", "").str.strip_chars()
+    qp_lower = qp.str.to_lowercase()
+
+    # Quality dispatch: same precedence as parse_chord's if/elif chain
+    quality = (
+        pl.when(qp.str.contains("maj7", literal=True) | qp.str.contains("M7", literal=True))
+        .then(pl.lit("maj7"))
+        .when(qp.str.contains("min7", literal=True) | qp.str.contains("m7", literal=True))
+        .then(pl.lit("min7"))
+        .when(qp.str.contains("7", literal=True))
+        .then(pl.lit("7"))
+        .when(qp.str.contains("dim", literal=True))
+        .then(pl.lit("dim"))
+        .when(qp.str.contains("aug", literal=True))
+        .then(pl.lit("aug"))
+        .when(qp.str.contains("sus4", literal=True))
+        .then(pl.lit("sus4"))
+        .when(qp.str.contains("sus2", literal=True))
+        .then(pl.lit("sus2"))
+        .when(qp.str.contains("sus", literal=True))
+        .then(pl.lit("sus"))
+        .when(qp.str.contains("add9", literal=True))
+        .then(pl.lit("add9"))
+        .when(qp.str.contains("add11", literal=True))
+        .then(pl.lit("add11"))
+        .when(qp.str.contains("add13", literal=True))
+        .then(pl.lit("add13"))
+        .when(qp.str.contains("add", literal=True))
+        .then(pl.lit("add"))
+        .when(qp_lower.is_in(["m", "min", "minor"]))
+        .then(pl.lit("min"))
+        .when(qp_lower.is_in(["maj", "major", ""]))
+        .then(pl.lit("maj"))
+        # Mirror the scalar fallback's quality_map lookup: "diminished" and
+        # "augmented" are its only keys whose value differs from the key
+        # itself and that can still be live here (case variants dodge the
+        # case-sensitive substring checks above)
+        .when(qp_lower == "diminished")
+        .then(pl.lit("dim"))
+        .when(qp_lower == "augmented")
+        .then(pl.lit("aug"))
+        .otherwise(qp_lower)
+    )
+
+    return (
+        tokens.select(
+            pl.col("song_id"),
+            pl.when(quality == "maj")
+            .then(root)
+            .otherwise(root + quality)
+            .alias("chord"),
+        )
+        .filter(pl.col("chord").is_not_null())
+        .collect(engine="streaming")
+    )
+
+
 def parse_chords(chord_string: str) -> List[str]:
     """Parse a chord sequence string into a list of normalized chords.
     
@@ -142,7 +300,7 @@ def parse_chords(chord_string: str) -> List[str]:
         return []
     
     # Strip section tags (<verse_1>, <chorus_2>, etc.)
-    chord_string = re.sub(r'<[^>]+>', '', chord_string)
+    chord_string = _SECTION_RE.sub('', chord_string)
     
     # Split on whitespace
     raw_chords = chord_string.split()
@@ -7,10 +7,12 @@ import polars as pl
 
 
 def get_row_count(file_path: Union[str, Path]) -> int:
-    """Quickly estimate row count of a CSV file.
-    
+    """Estimate row count of a CSV file.
+
     Uses Polars lazy evaluation to count rows without loading full file.
-    
+    Note this still costs a full parse of the file, so load_data no longer
+    calls it - it is kept as an opt-in helper for callers that need a count.
+
     Args:
         file_path: Path to CSV file
         
@@ -52,46 +54,47 @@ def load_data(file_path: Union[str, Path], chunk_size: int = 10000) -> Iterator[
         DataFrame chunks (or single DataFrame for small files)
     """
     file_path = Path(file_path)
-    
+
     if not file_path.exists():
         raise FileNotFoundError(f"Dataset file not found: {file_path}")
-    
-    # Detect file size
-    try:
-        row_count = get_row_count(file_path)
-    except Exception as e:
-        # Fallback: use file size as proxy
-        file_size_mb = file_path.stat().st_size / (1024 * 1024)
-        # Rough estimate: ~1KB per row (conservative)
-        row_count = int(file_size_mb * 1024)
-    
-    # Determine processing mode
-    SMALL_DATASET_THRESHOLD = 10000  # Use chunked processing if >= this many rows
-    
-    if row_count < SMALL_DATASET_THRESHOLD:
+
+    # Detect the chord column from the header alone, so the projection can be
+    # pushed down into the CSV reader and only that column gets parsed
+    header_df = pl.read_csv(str(file_path), n_rows=0)
+    chord_column = get_chord_column_name(header_df)
+
+    # Determine processing mode from file size alone - counting rows up front
+    # would cost a full pass over the file (see get_row_count, now opt-in only)
+    SMALL_DATASET_THRESHOLD_MB = 20  # Use chunked processing above this size
+    file_size_mb = file_path.stat().st_size / (1024 * 1024)
+
+    if file_size_mb < SMALL_DATASET_THRESHOLD_MB:
         # Small dataset: load entire file
-        print(f"Loading small dataset ({row_count} rows) - loading entire file...")
-        df = pl.read_csv(str(file_path))
+        print(f"Loading small dataset ({file_size_mb:.1f} MB) - loading entire file...")
+        df = pl.read_csv(str(file_path), columns=[chord_column], rechunk=False)
         yield df
     else:
         # Large dataset: use chunked processing
-        print(f"Loading large dataset ({row_count} rows) - using chunked processing (chunk size: {chunk_size})...")
-        
-        # Use lazy evaluation with streaming
-        lazy_df = pl.scan_csv(str(file_path))
-        
-        # Process in chunks
+        print(f"Loading large dataset ({file_size_mb:.1f} MB) - using chunked processing (chunk size: {chunk_size})...")
+
+        # Parse the projected column once with all cores, then hand out
+        # zero-copy views: iter_slices is O(1) per chunk since a slice of a
+        # DataFrame only bumps offsets into the existing Arrow buffers
+        df = pl.read_csv(
+            str(file_path),
+            columns=[chord_column],
+            rechunk=False,
+            n_threads=os.cpu_count(),
+        )
+
         offset = 0
-        while offset < row_count:
-            chunk = lazy_df.slice(offset, chunk_size).collect()
-            if len(chunk) == 0:
-                break
+        for chunk in df.iter_slices(chunk_size):
             yield chunk
-            offset += chunk_size
-            
+            offset += len(chunk)
+
             # Progress indicator
             if offset % (chunk_size * 10) == 0:
-                print(f"  Processed {min(offset, row_count)} / {row_count} rows...")
+                print(f"  Read {offset} rows...")
 
 
 def get_chord_column_name(df: pl.DataFrame) -> str:
@@ -3,195 +3,378 @@
 from collections import defaultdict, Counter
 from typing import List, Dict, Tuple, Optional, Callable
 
+import numpy as np
+
+try:
+    from numba import njit, typed, types
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Chord IDs are packed into int64 keys at 21 bits per chord
+# (supports vocabularies up to ~2M chords)
+_ID_BITS = 21
+_ID_MASK = (1 << _ID_BITS) - 1
+_UNI_MASK = (1 << (2 * _ID_BITS)) - 1  # low 2 ids of a packed window
+_BI_MASK = (1 << (3 * _ID_BITS)) - 1  # low 3 ids of a packed window
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True)
+    def _count_all(arr, uni_kv, bi_kv, tri_kv):
+        """Count all three n-gram orders in one pass over the sequence.
+
+        Maintains a sliding window of the last ids packed into a single
+        int64: each step shifts the new chord in and masks off whichever
+        suffix each order needs. One scan, one window update per chord,
+        instead of three separate passes.
+        """
+        n = arr.shape[0]
+        if n < 2:
+            return
+        packed = arr[0]
+        prev_bi = 0
+        for i in range(1, n):
+            packed = ((packed & _UNI_MASK) << _ID_BITS) | arr[i]
+            uni_key = packed & _UNI_MASK
+            uni_kv[uni_key] = uni_kv.get(uni_key, 0) + 1
+            if i >= 2:
+                bi_key = packed & _BI_MASK
+                bi_kv[bi_key] = bi_kv.get(bi_key, 0) + 1
+                if i >= 3:
+                    # Trigram context is the 3-id window ending one step
+                    # back; 4 packed ids would overflow 64 bits
+                    tri_key = (prev_bi, arr[i])
+                    tri_kv[tri_key] = tri_kv.get(tri_key, 0) + 1
+                prev_bi = bi_key
+
+    def _make_count_dicts():
+        """Allocate the numba typed dicts backing the counting kernel."""
+        return (
+            typed.Dict.empty(types.int64, types.int64),
+            typed.Dict.empty(types.int64, types.int64),
+            typed.Dict.empty(types.UniTuple(types.int64, 2), types.int64),
+        )
+
+    def _warm_kernels():
+        """Trigger JIT compilation once on a tiny array (cached via cache=True)."""
+        arr = np.arange(4, dtype=np.int64)
+        uni_kv, bi_kv, tri_kv = _make_count_dicts()
+        _count_all(arr, uni_kv, bi_kv, tri_kv)
+
+    _warm_kernels()
+
 
 class NGramBuilder:
     """Builds n-gram models with memory-efficient incremental counting."""
-    
+
     def __init__(self):
         """Initialize empty counters for unigram, bigram, and trigram models."""
-        # Counters: context -> {next_chord: count}
-        self.unigram_counts = Counter()  # Single chord -> {next_chord: count}
-        self.bigram_counts = defaultdict(Counter)  # "C,G" -> {next_chord: count}
-        self.trigram_counts = defaultdict(Counter)  # "C,G,Amin" -> {next_chord: count}
-        
-        # Also track context counts for backoff threshold checking
-        self.unigram_context_counts = Counter()  # Single chord -> total count
-        self.bigram_context_counts = Counter()  # "C,G" -> total count
-        self.trigram_context_counts = Counter()  # "C,G,Amin" -> total count
-        
-        self._normalized = False
-    
+        # Flat counters keyed by packed int64 n-gram ids, the same layout the
+        # compiled kernels use: hashing a small int beats hashing a tuple of
+        # strings, and key memory drops to a single machine word. Trigram keys
+        # are (packed context, next id) tuples since four packed ids would
+        # overflow 64 bits. Chord strings exist once, in the vocabulary.
+        self.unigram_counts = Counter()  # (a << 21) | b -> count
+        self.bigram_counts = Counter()  # (a << 42) | (b << 21) | c -> count
+        self.trigram_counts = Counter()  # ((a<<42)|(b<<21)|c, d) -> count
+
+        # Context totals for backoff threshold checking; derived from the flat
+        # counters in finalize() rather than maintained during counting
+        self.unigram_context_counts = Counter()  # chord id -> total count
+        self.bigram_context_counts = Counter()  # (a << 21) | b -> total count
+        self.trigram_context_counts = Counter()  # (a<<42)|(b<<21)|c -> total count
+
+        # Chord string <-> int id vocabulary
+        self.vocab: Dict[str, int] = {}
+        self.inv_vocab: List[str] = []
+
+        if NUMBA_AVAILABLE:
+            self._uni_kv, self._bi_kv, self._tri_kv = _make_count_dicts()
+
+        self._finalized = False
+
+    def _intern(self, chord: str) -> int:
+        """Map a chord string to its int id, extending the vocabulary on miss."""
+        chord_id = self.vocab.get(chord)
+        if chord_id is None:
+            chord_id = len(self.inv_vocab)
+            self.vocab[chord] = chord_id
+            self.inv_vocab.append(chord)
+        return chord_id
+
     def update_counts(self, chord_sequence: List[str], progress_callback: Optional[Callable] = None):
         """Update n-gram counts from a chord sequence.
-        
+
         Processes one song at a time, updating counts incrementally.
         Does not store the full sequence - only updates counts.
-        
+
+        When numba is available, the sequence is encoded to an int-id array and
+        all three orders are counted by a single JIT-compiled sliding-window
+        pass keyed on packed int64 n-gram ids; otherwise falls back to
+        pure-Python counting over the same packed keys.
+
         Args:
             chord_sequence: List of normalized chord strings
             progress_callback: Optional callback function for progress updates
         """
         if not chord_sequence or len(chord_sequence) < 1:
             return
-        
-        # Unigram (first-order Markov): P(next | current)
-        for i in range(len(chord_sequence) - 1):
-            current = chord_sequence[i]
-            next_chord = chord_sequence[i + 1]
-            self.unigram_counts[(current, next_chord)] += 1
-            self.unigram_context_counts[current] += 1
-        
-        # Bigram: P(next | last 2 chords)
-        for i in range(len(chord_sequence) - 2):
-            context = (chord_sequence[i], chord_sequence[i + 1])
-            next_chord = chord_sequence[i + 2]
-            context_key = ",".join(context)
-            self.bigram_counts[context_key][next_chord] += 1
-            self.bigram_context_counts[context_key] += 1
-        
-        # Trigram: P(next | last 3 chords)
-        for i in range(len(chord_sequence) - 3):
-            context = (chord_sequence[i], chord_sequence[i + 1], chord_sequence[i + 2])
-            next_chord = chord_sequence[i + 3]
-            context_key = ",".join(context)
-            self.trigram_counts[context_key][next_chord] += 1
-            self.trigram_context_counts[context_key] += 1
-        
+
+        if NUMBA_AVAILABLE:
+            arr = np.empty(len(chord_sequence), dtype=np.int64)
+            for i, chord in enumerate(chord_sequence):
+                arr[i] = self._intern(chord)
+            _count_all(arr, self._uni_kv, self._bi_kv, self._tri_kv)
+        else:
+            self._update_counts_ids([self._intern(c) for c in chord_sequence])
+
         if progress_callback:
             progress_callback()
-    
-    def normalize(self):
-        """Convert counts to probabilities.
-        
-        Normalizes each context's counts to sum to 1.0 (probability distribution).
+
+    def intern_chords(self, chords) -> None:
+        """Extend the vocabulary with an iterable of chord strings."""
+        for chord in chords:
+            self._intern(chord)
+
+    def update_counts_batch(self, chord_ids: np.ndarray, song_lengths: np.ndarray):
+        """Update n-gram counts from a whole batch of songs at once.
+
+        Columnar twin of update_counts: chord_ids is the flat int-id array for
+        every song in the batch back to back, and song_lengths gives the length
+        of each song's slice. Ids must come from this builder's vocabulary
+        (see intern_chords). Avoids materializing per-song Python string lists.
+
+        Args:
+            chord_ids: Flat int64 array of chord ids, songs concatenated
+            song_lengths: Per-song sequence lengths summing to len(chord_ids)
         """
-        if self._normalized:
-            return
-        
-        # Normalize unigram
-        self.unigram_probs = defaultdict(dict)
-        for (context, next_chord), count in self.unigram_counts.items():
-            total = self.unigram_context_counts[context]
-            if total > 0:
-                prob = count / total
-                if context not in self.unigram_probs:
-                    self.unigram_probs[context] = {}
-                self.unigram_probs[context][next_chord] = prob
-        
-        # Normalize bigram
-        self.bigram_probs = {}
-        for context_key, next_chord_counts in self.bigram_counts.items():
-            total = self.bigram_context_counts[context_key]
-            if total > 0:
-                self.bigram_probs[context_key] = {
-                    next_chord: count / total
-                    for next_chord, count in next_chord_counts.items()
-                }
-        
-        # Normalize trigram
-        self.trigram_probs = {}
-        for context_key, next_chord_counts in self.trigram_counts.items():
-            total = self.trigram_context_counts[context_key]
-            if total > 0:
-                self.trigram_probs[context_key] = {
-                    next_chord: count / total
-                    for next_chord, count in next_chord_counts.items()
-                }
-        
-        self._normalized = True
-    
-    def apply_smoothing(self, alpha: float = 1.0):
-        """Apply add-one (Laplace) smoothing to handle unseen transitions.
-        
-        Adds alpha (default 1.0) to each count before normalization.
-        This ensures all possible transitions have non-zero probability.
-        
+        chord_ids = np.ascontiguousarray(chord_ids, dtype=np.int64)
+
+        offset = 0
+        if NUMBA_AVAILABLE:
+            for length in song_lengths:
+                _count_all(
+                    chord_ids[offset:offset + length],
+                    self._uni_kv, self._bi_kv, self._tri_kv,
+                )
+                offset += length
+        else:
+            for length in song_lengths:
+                self._update_counts_ids(chord_ids[offset:offset + length].tolist())
+                offset += length
+
+    def get_raw_counts(self) -> Dict:
+        """Export the raw id-keyed counters plus the vocabulary that defines
+        them, e.g. for cross-process merging.
+
+        Materializes any compiled counts first, so the result is complete and
+        picklable regardless of which counting path was used.
+        """
+        if NUMBA_AVAILABLE:
+            self._materialize_counts()
+            self._uni_kv, self._bi_kv, self._tri_kv = _make_count_dicts()
+        return {
+            "vocab": self.inv_vocab,
+            "unigram": self.unigram_counts,
+            "bigram": self.bigram_counts,
+            "trigram": self.trigram_counts,
+        }
+
+    def merge_raw_counts(self, counts: Dict):
+        """Merge counters produced by another builder's get_raw_counts.
+
+        The other builder assigned its own chord ids, so keys are repacked
+        through an old-id -> new-id table before merging.
+        """
+        remap = [self._intern(chord) for chord in counts["vocab"]]
+
+        for key, count in counts["unigram"].items():
+            self.unigram_counts[
+                (remap[key >> _ID_BITS] << _ID_BITS) | remap[key & _ID_MASK]
+            ] += count
+        for key, count in counts["bigram"].items():
+            self.bigram_counts[
+                (remap[key >> (2 * _ID_BITS)] << (2 * _ID_BITS))
+                | (remap[(key >> _ID_BITS) & _ID_MASK] << _ID_BITS)
+                | remap[key & _ID_MASK]
+            ] += count
+        for (ctx_key, next_id), count in counts["trigram"].items():
+            new_ctx = (
+                (remap[ctx_key >> (2 * _ID_BITS)] << (2 * _ID_BITS))
+                | (remap[(ctx_key >> _ID_BITS) & _ID_MASK] << _ID_BITS)
+                | remap[ctx_key & _ID_MASK]
+            )
+            self.trigram_counts[(new_ctx, remap[next_id])] += count
+
+    def _update_counts_ids(self, ids: List[int]):
+        """Pure-Python counting fallback used when numba is not installed.
+
+        The flat counters take whole generators of packed keys at once via
+        Counter.update's C-implemented bulk path.
+        """
+        # Unigram (first-order Markov): P(next | current)
+        self.unigram_counts.update(
+            (a << _ID_BITS) | b for a, b in zip(ids, ids[1:])
+        )
+
+        # Bigram: P(next | last 2 chords)
+        self.bigram_counts.update(
+            (a << (2 * _ID_BITS)) | (b << _ID_BITS) | c
+            for a, b, c in zip(ids, ids[1:], ids[2:])
+        )
+
+        # Trigram: P(next | last 3 chords)
+        self.trigram_counts.update(
+            ((a << (2 * _ID_BITS)) | (b << _ID_BITS) | c, d)
+            for a, b, c, d in zip(ids, ids[1:], ids[2:], ids[3:])
+        )
+
+    def _materialize_counts(self):
+        """Fold the numba typed dicts into the Python counters; keys share the
+        same packed layout, so this is three bulk Counter.update calls."""
+        self.unigram_counts.update(self._uni_kv)
+        self.bigram_counts.update(self._bi_kv)
+        self.trigram_counts.update(self._tri_kv)
+
+    def finalize(self, alpha: float = 1.0):
+        """Prepare counts for export in a single pass.
+
+        Materializes compiled counts (when numba was used), derives the
+        per-context totals from the flat counters, fixes the smoothing alpha,
+        and derives the chord vocabulary. Replaces the old
+        normalize() -> apply_smoothing() chain, which built per-context
+        probability dicts only to recompute them with the smoothing formula;
+        with sparse counts exported directly, neither set of intermediate
+        dicts is needed at all.
+
         Args:
             alpha: Smoothing parameter (default 1.0 for add-one smoothing)
         """
-        if not self._normalized:
-            self.normalize()
-        
-        # Collect all unique chords (vocabulary)
-        all_chords = set()
-        for context in self.unigram_probs:
-            all_chords.add(context)
-            all_chords.update(self.unigram_probs[context].keys())
-        for context_key in self.bigram_probs:
-            all_chords.update(self.bigram_probs[context_key].keys())
-        for context_key in self.trigram_probs:
-            all_chords.update(self.trigram_probs[context_key].keys())
-        
-        vocab_size = len(all_chords)
-        
-        # Apply smoothing to unigram
-        self.unigram_probs_smooth = {}
-        for context in self.unigram_probs:
-            smoothed_probs = {}
-            context_total = self.unigram_context_counts[context]
-            
-            for chord in all_chords:
-                original_count = self.unigram_counts.get((context, chord), 0)
-                smoothed_count = original_count + alpha
-                smoothed_probs[chord] = smoothed_count / (context_total + alpha * vocab_size)
-            
-            self.unigram_probs_smooth[context] = smoothed_probs
-        
-        # Apply smoothing to bigram
-        self.bigram_probs_smooth = {}
-        for context_key in self.bigram_probs:
-            smoothed_probs = {}
-            context_total = self.bigram_context_counts[context_key]
-            
-            for chord in all_chords:
-                original_count = self.bigram_counts[context_key].get(chord, 0)
-                smoothed_count = original_count + alpha
-                smoothed_probs[chord] = smoothed_count / (context_total + alpha * vocab_size)
-            
-            self.bigram_probs_smooth[context_key] = smoothed_probs
-        
-        # Apply smoothing to trigram
-        self.trigram_probs_smooth = {}
-        for context_key in self.trigram_probs:
-            smoothed_probs = {}
-            context_total = self.trigram_context_counts[context_key]
-            
-            for chord in all_chords:
-                original_count = self.trigram_counts[context_key].get(chord, 0)
-                smoothed_count = original_count + alpha
-                smoothed_probs[chord] = smoothed_count / (context_total + alpha * vocab_size)
-            
-            self.trigram_probs_smooth[context_key] = smoothed_probs
-    
-    def get_models(self, include_counts: bool = False) -> Dict[str, Dict]:
-        """Get normalized models with optional count metadata.
-        
+        if self._finalized:
+            return
+
+        if NUMBA_AVAILABLE:
+            self._materialize_counts()
+
+        # Derive context totals by grouping the flat counters once; dropping
+        # the low 21 bits of a packed key strips the next-chord id
+        for key, count in self.unigram_counts.items():
+            self.unigram_context_counts[key >> _ID_BITS] += count
+        for key, count in self.bigram_counts.items():
+            self.bigram_context_counts[key >> _ID_BITS] += count
+        for (ctx_key, _), count in self.trigram_counts.items():
+            self.trigram_context_counts[ctx_key] += count
+
+        self._smooth_vocab = list(self.inv_vocab)
+        self.smoothing_alpha = alpha
+        self._finalized = True
+
+    def _decode_context(self, packed: int, size: int) -> str:
+        """Decode a packed context key back to its "C,G" export string."""
+        inv = self.inv_vocab
+        return ",".join(
+            inv[(packed >> shift) & _ID_MASK]
+            for shift in range((size - 1) * _ID_BITS, -1, -_ID_BITS)
+        )
+
+    def get_models(self, include_counts: bool = False, min_context_total: int = 1) -> Dict[str, Dict]:
+        """Get models in sparse export form with optional count metadata.
+
+        Each model serializes as {"alpha", "vocab_size", "contexts"} where a
+        context entry holds its total count and the observed next-chord counts
+        only. Consumers reconstruct the Laplace-smoothed probability lazily:
+        (obs.get(chord, 0) + alpha) / (total + alpha * vocab_size). Every
+        unseen chord shares the same default, so nothing is lost by never
+        materializing the dense contexts x vocabulary distributions.
+
+        Ids are decoded back to chord strings only here, at export time.
+
         Args:
             include_counts: If True, include count metadata for backoff threshold checking
-            
+            min_context_total: Omit bigram/trigram contexts with a total below
+                this (the frontend backs off below BACKOFF_THRESHOLD without
+                ever consulting them). Their raw totals still appear in the
+                count metadata, which is what backoff decisions read.
+
         Returns:
             Dictionary with 'unigram', 'bigram', 'trigram' models
         """
-        if not self._normalized:
-            self.normalize()
-        
-        # Use smoothed probabilities if available, otherwise use regular probabilities
-        unigram_probs = getattr(self, 'unigram_probs_smooth', self.unigram_probs)
-        bigram_probs = getattr(self, 'bigram_probs_smooth', self.bigram_probs)
-        trigram_probs = getattr(self, 'trigram_probs_smooth', self.trigram_probs)
-        
+        if not self._finalized:
+            self.finalize()
+
+        alpha = self.smoothing_alpha
+        vocab_size = len(self._smooth_vocab)
+        inv = self.inv_vocab
+
+        # Regroup the flat counters by context, decoding ids to strings.
+        # Below-threshold bigram/trigram contexts are dropped here, before
+        # any decoding work is spent on them; the unigram model is always
+        # exported in full since the frontend never backs off past it.
+        unigram_obs = defaultdict(dict)
+        for key, count in self.unigram_counts.items():
+            unigram_obs[key >> _ID_BITS][inv[key & _ID_MASK]] = count
+
+        bigram_obs = defaultdict(dict)
+        for key, count in self.bigram_counts.items():
+            ctx = key >> _ID_BITS
+            if self.bigram_context_counts[ctx] < min_context_total:
+                continue
+            bigram_obs[ctx][inv[key & _ID_MASK]] = count
+
+        trigram_obs = defaultdict(dict)
+        for (ctx_key, next_id), count in self.trigram_counts.items():
+            if self.trigram_context_counts[ctx_key] < min_context_total:
+                continue
+            trigram_obs[ctx_key][inv[next_id]] = count
+
         models = {
-            "unigram": unigram_probs,
-            "bigram": bigram_probs,
-            "trigram": trigram_probs,
+            "unigram": {
+                "alpha": alpha,
+                "vocab_size": vocab_size,
+                "contexts": {
+                    inv[ctx]: {"total": self.unigram_context_counts[ctx], "obs": observed}
+                    for ctx, observed in unigram_obs.items()
+                },
+            },
+            "bigram": {
+                "alpha": alpha,
+                "vocab_size": vocab_size,
+                "contexts": {
+                    self._decode_context(ctx, 2): {
+                        "total": self.bigram_context_counts[ctx],
+                        "obs": observed,
+                    }
+                    for ctx, observed in bigram_obs.items()
+                },
+            },
+            "trigram": {
+                "alpha": alpha,
+                "vocab_size": vocab_size,
+                "contexts": {
+                    self._decode_context(ctx, 3): {
+                        "total": self.trigram_context_counts[ctx],
+                        "obs": observed,
+                    }
+                    for ctx, observed in trigram_obs.items()
+                },
+            },
         }
-        
+
         if include_counts:
             models["metadata"] = {
-                "unigram_counts": dict(self.unigram_context_counts),
-                "bigram_counts": dict(self.bigram_context_counts),
-                "trigram_counts": dict(self.trigram_context_counts),
+                "unigram_counts": {
+                    inv[ctx]: count for ctx, count in self.unigram_context_counts.items()
+                },
+                "bigram_counts": {
+                    self._decode_context(ctx, 2): count
+                    for ctx, count in self.bigram_context_counts.items()
+                },
+                "trigram_counts": {
+                    self._decode_context(ctx, 3): count
+                    for ctx, count in self.trigram_context_counts.items()
+                },
             }
-        
-        return models
 
+        return models
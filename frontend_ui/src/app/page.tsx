@@ -224,7 +224,7 @@ export default function Home() {
               </p>
               {models && (
                 <div className="flex flex-wrap gap-2 justify-center">
-                  {Object.keys(models.unigram)
+                  {Object.keys(models.unigram.contexts)
                     .slice(0, 16)
                     .map((chord) => (
                       <button
@@ -259,7 +259,7 @@ export default function Home() {
         <footer className="mt-12 pt-8 border-t border-gray-200 text-center text-xs text-gray-400">
           {models && (
             <p className="mb-4">
-              {Object.keys(models.unigram).length.toLocaleString()} chords · {Object.keys(models.bigram).length.toLocaleString()} bigrams · {Object.keys(models.trigram).length.toLocaleString()} trigrams
+              {Object.keys(models.unigram.contexts).length.toLocaleString()} chords · {Object.keys(models.bigram.contexts).length.toLocaleString()} bigrams · {Object.keys(models.trigram.contexts).length.toLocaleString()} trigrams
             </p>
           )}
           <p>© Sid Valecha 2026</p>
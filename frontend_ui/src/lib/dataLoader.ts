@@ -1,4 +1,4 @@
-import { Models } from '@/types';
+import { Models, NGramModel } from '@/types';
 
 let cachedModels: Models | null = null;
 
@@ -11,6 +11,30 @@ export interface LoadProgress {
   currentFile: string;
 }
 
+/**
+ * Parse a line-delimited model file into an NGramModel.
+ *
+ * The first line is the smoothing header {"alpha", "vocab_size"}; each
+ * following line is one context {"c": context, "t": total, "o": obs}.
+ * Parsing many small lines avoids one giant JSON.parse over the whole
+ * bigram/trigram payload.
+ */
+function parseModelJsonl(text: string): NGramModel {
+  const lines = text.split('\n');
+  const header = JSON.parse(lines[0]);
+  const model: NGramModel = {
+    alpha: header.alpha,
+    vocab_size: header.vocab_size,
+    contexts: {},
+  };
+  for (let i = 1; i < lines.length; i++) {
+    if (lines[i].length === 0) continue;
+    const entry = JSON.parse(lines[i]);
+    model.contexts[entry.c] = { total: entry.t, obs: entry.o };
+  }
+  return model;
+}
+
 export async function loadModels(
   onProgress?: (progress: LoadProgress) => void
 ): Promise<Models> {
@@ -19,9 +43,9 @@ export async function loadModels(
   }
 
   const files = [
-    { name: 'unigram.json', key: 'unigram' },
-    { name: 'bigram.json', key: 'bigram' },
-    { name: 'trigram.json', key: 'trigram' },
+    { name: 'unigram.json', key: 'unigram', jsonl: false },
+    { name: 'bigram.jsonl', key: 'bigram', jsonl: true },
+    { name: 'trigram.jsonl', key: 'trigram', jsonl: true },
   ];
 
   const results: Record<string, unknown> = {};
@@ -40,7 +64,9 @@ export async function loadModels(
       if (!response.ok) {
         throw new Error(`Failed to load ${file.name}: ${response.status}`);
       }
-      results[file.key] = await response.json();
+      results[file.key] = file.jsonl
+        ? parseModelJsonl(await response.text())
+        : await response.json();
     }
 
     onProgress?.({
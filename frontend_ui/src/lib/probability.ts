@@ -1,4 +1,4 @@
-import { Models, InterpolationWeights } from '@/types';
+import { Models, NGramModel, InterpolationWeights } from '@/types';
 
 const DEFAULT_WEIGHTS: InterpolationWeights = {
   lambda3: 0.60, // Trigram
@@ -84,14 +84,32 @@ function adjustWeights(
   return { lambda1, lambda2, lambda3 };
 }
 
+interface SmoothedContext {
+  probs: Record<string, number>; // Smoothed probabilities for observed chords
+  unseenProb: number; // Shared smoothed probability for any unseen chord
+}
+
+const EMPTY_CONTEXT: SmoothedContext = { probs: {}, unseenProb: 0 };
+
 /**
- * Get probabilities from a specific model for a given context
+ * Get smoothed probabilities for a context from a sparse model.
+ *
+ * Models store raw counts; the Laplace-smoothed probability is computed
+ * lazily here as (count + alpha) / (total + alpha * vocab_size). Every
+ * chord not observed after this context shares the same unseenProb.
  */
-function getModelProbabilities(
-  model: Models['unigram'] | Models['bigram'] | Models['trigram'],
-  context: string
-): Record<string, number> {
-  return model[context] || {};
+function getSmoothedContext(model: NGramModel, context: string): SmoothedContext {
+  const entry = model.contexts[context];
+  if (!entry) {
+    return EMPTY_CONTEXT;
+  }
+
+  const denom = entry.total + model.alpha * model.vocab_size;
+  const probs: Record<string, number> = {};
+  for (const chord in entry.obs) {
+    probs[chord] = (entry.obs[chord] + model.alpha) / denom;
+  }
+  return { probs, unseenProb: model.alpha / denom };
 }
 
 /**
@@ -116,30 +134,30 @@ export function computeProbabilities(
   // Collect all possible next chords from all models
   const allNextChords = new Set<string>();
 
-  // Get probabilities from each model
-  let trigramProbs: Record<string, number> = {};
-  let bigramProbs: Record<string, number> = {};
-  let unigramProbs: Record<string, number> = {};
+  // Get smoothed probabilities from each model
+  let trigramCtx = EMPTY_CONTEXT;
+  let bigramCtx = EMPTY_CONTEXT;
+  let unigramCtx = EMPTY_CONTEXT;
 
   // Trigram: P(next | last 3 chords)
   if (progression.length >= 3 && contextCounts.trigram !== undefined && contextCounts.trigram >= BACKOFF_THRESHOLD) {
     const context = progression.slice(-3).join(',');
-    trigramProbs = getModelProbabilities(models.trigram, context);
-    Object.keys(trigramProbs).forEach(chord => allNextChords.add(chord));
+    trigramCtx = getSmoothedContext(models.trigram, context);
+    Object.keys(trigramCtx.probs).forEach(chord => allNextChords.add(chord));
   }
 
   // Bigram: P(next | last 2 chords)
   if (progression.length >= 2 && contextCounts.bigram !== undefined && contextCounts.bigram >= BACKOFF_THRESHOLD) {
     const context = progression.slice(-2).join(',');
-    bigramProbs = getModelProbabilities(models.bigram, context);
-    Object.keys(bigramProbs).forEach(chord => allNextChords.add(chord));
+    bigramCtx = getSmoothedContext(models.bigram, context);
+    Object.keys(bigramCtx.probs).forEach(chord => allNextChords.add(chord));
   }
 
   // Unigram: P(next | last chord)
   if (progression.length >= 1) {
     const context = progression[progression.length - 1];
-    unigramProbs = getModelProbabilities(models.unigram, context);
-    Object.keys(unigramProbs).forEach(chord => allNextChords.add(chord));
+    unigramCtx = getSmoothedContext(models.unigram, context);
+    Object.keys(unigramCtx.probs).forEach(chord => allNextChords.add(chord));
   }
 
   // If no probabilities found, return empty
@@ -151,9 +169,11 @@ export function computeProbabilities(
   const finalProbs: Record<string, number> = {};
 
   for (const chord of allNextChords) {
-    const p3 = trigramProbs[chord] || 0;
-    const p2 = bigramProbs[chord] || 0;
-    const p1 = unigramProbs[chord] || 0;
+    // Chords unseen after an active context still get that context's
+    // shared smoothed default (zero when the context itself is inactive)
+    const p3 = trigramCtx.probs[chord] ?? trigramCtx.unseenProb;
+    const p2 = bigramCtx.probs[chord] ?? bigramCtx.unseenProb;
+    const p1 = unigramCtx.probs[chord] ?? unigramCtx.unseenProb;
 
     const interpolated =
       adjustedWeights.lambda3 * p3 +
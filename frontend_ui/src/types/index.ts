@@ -1,7 +1,15 @@
+export interface SparseContextEntry {
+  total: number; // Total count of this context
+  obs: Record<string, number>; // Observed next-chord counts only
+}
+
+// Models ship sparse counts plus smoothing parameters; smoothed
+// probabilities are computed at query time as
+// (obs[chord] ?? 0 + alpha) / (total + alpha * vocab_size)
 export interface NGramModel {
-  [context: string]: {
-    [nextChord: string]: number;
-  };
+  alpha: number;
+  vocab_size: number;
+  contexts: Record<string, SparseContextEntry>;
 }
 
 export interface Models {